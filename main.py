@@ -1,24 +1,102 @@
 import asyncio
-import json
+import logging
 import math
+import mmap
+import random
 import re
 import time
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Awaitable, Callable, Optional
 
-import httpx
+import aiohttp
+import numpy as np
+import orjson
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 
+logger = logging.getLogger("knot")
+
 ROOT = Path(__file__).resolve().parent
 SPOTS_PATH = ROOT / "data" / "spots.json"
+USER_AGENT = "knot (contact: weisfoo.com)"
+COORDINATE_DECIMALS = 2
 WIND_THRESHOLD_KT = 5
 TIDE_THRESHOLD_FT = 1.5
 CACHE_TTL_SECONDS = 10 * 60
+CACHE_STALE_SECONDS = 30 * 60
 MAP_CACHE_TTL_SECONDS = 10 * 60
+MAP_CACHE_STALE_SECONDS = 30 * 60
 GRID_CACHE_TTL_SECONDS = 5 * 60
+MAP_FETCH_CONCURRENCY = 16
+FETCH_MAX_ATTEMPTS = 3
+FETCH_RETRY_BASE_SECONDS = 0.5
+FETCH_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+NWS_POINTS_CACHE_TTL_SECONDS = 24 * 60 * 60
+CACHE_PURGE_INTERVAL_SECONDS = 60
+OPEN_METEO_FORECAST_URL = (
+    "https://api.open-meteo.com/v1/forecast"
+    "?latitude={lat}"
+    "&longitude={lon}"
+    "&hourly=temperature_2m,windspeed_10m,winddirection_10m,windgusts_10m,weathercode"
+    "&current_weather=true"
+    "&past_days=1"
+    "&windspeed_unit=kn"
+    "&temperature_unit=fahrenheit"
+    "&timezone=auto"
+)
+OPEN_METEO_GRID_URL = (
+    "https://api.open-meteo.com/v1/forecast"
+    "?latitude={lat}"
+    "&longitude={lon}"
+    "&current_weather=true"
+    "&windspeed_unit=kn"
+    "&timezone=auto"
+)
+OPEN_METEO_MARINE_URL = (
+    "https://marine-api.open-meteo.com/v1/marine"
+    "?latitude={lat}"
+    "&longitude={lon}"
+    "&hourly=wave_height,wave_direction,wave_period"
+    "&timezone=auto"
+)
+NOAA_TIDES_URL = (
+    "https://api.tidesandcurrents.noaa.gov/api/prod/datagetter"
+    "?product=predictions"
+    "&application=knot"
+    "&date=today"
+    "&datum=MLLW"
+    "&station={station}"
+    "&time_zone=lst_ldt"
+    "&interval=hilo"
+    "&units=english"
+    "&format=json"
+)
+FORECAST_HOURLY_KEYS = frozenset(
+    {"time", "temperature_2m", "windspeed_10m", "winddirection_10m", "windgusts_10m", "weathercode"}
+)
+MARINE_HOURLY_KEYS = frozenset({"time", "wave_height", "wave_direction", "wave_period"})
+NWS_POINTS_URL = "https://api.weather.gov/points/{lat},{lon}"
+WIND_SPEED_PATTERN = re.compile(r"\d+")
+CARDINAL_DEGREES = {
+    "N": 0.0,
+    "NNE": 22.5,
+    "NE": 45.0,
+    "ENE": 67.5,
+    "E": 90.0,
+    "ESE": 112.5,
+    "SE": 135.0,
+    "SSE": 157.5,
+    "S": 180.0,
+    "SSW": 202.5,
+    "SW": 225.0,
+    "WSW": 247.5,
+    "W": 270.0,
+    "WNW": 292.5,
+    "NW": 315.0,
+    "NNW": 337.5,
+}
 
 app = FastAPI(title="knot")
 app.add_middleware(
@@ -29,63 +107,136 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-cache: dict[str, dict[str, Any]] = {}
-map_cache: dict[str, dict[str, Any]] = {}
-grid_cache: dict[str, dict[str, Any]] = {}
 
+# Entries are (value, expires_at, stale_until) on the time.monotonic() clock.
+# Reads never evict; purge_caches() drops entries past their stale window.
+class TTLCache:
+    def __init__(self, ttl_seconds: float, stale_seconds: float = 0.0) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.entries: dict[Any, tuple[Any, float, float]] = {}
 
-def load_spots() -> list[dict[str, Any]]:
-    if not SPOTS_PATH.exists():
-        return []
-    try:
-        return json.loads(SPOTS_PATH.read_text())
-    except json.JSONDecodeError:
-        return []
+    def set(self, key: Any, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds
+        self.entries[key] = (value, expires_at, expires_at + self.stale_seconds)
 
+    def get(self, key: Any) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            return entry[0]
+        return None
 
-spots = load_spots()
+    def get_stale(self, key: Any) -> Optional[tuple[Any, bool]]:
+        # Returns (value, is_fresh) until the entry leaves its stale window.
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        now = time.monotonic()
+        if entry[2] <= now:
+            return None
+        return entry[0], entry[1] > now
+
+    def purge(self) -> None:
+        now = time.monotonic()
+        for key in [key for key, entry in self.entries.items() if entry[2] <= now]:
+            del self.entries[key]
+
+
+# The conditions and map caches hold response bodies already serialized to JSON.
+cache = TTLCache(CACHE_TTL_SECONDS, CACHE_STALE_SECONDS)
+map_cache = TTLCache(MAP_CACHE_TTL_SECONDS, MAP_CACHE_STALE_SECONDS)
+grid_cache = TTLCache(GRID_CACHE_TTL_SECONDS)
+nws_points_cache = TTLCache(NWS_POINTS_CACHE_TTL_SECONDS)
+inflight: dict[str, asyncio.Task] = {}
+janitor_task: Optional[asyncio.Task] = None
+map_semaphore = asyncio.Semaphore(MAP_FETCH_CONCURRENCY)
+timestamp_cache: tuple[int, str] = (0, "")
+
+http_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    global http_session
+    if http_session is None or http_session.closed:
+        http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300),
+            headers={"User-Agent": USER_AGENT},
+        )
+    return http_session
 
 
-def set_cache(key: str, value: dict[str, Any]) -> None:
-    cache[key] = {"value": value, "expires_at": time.time() + CACHE_TTL_SECONDS}
+@app.on_event("startup")
+async def open_http_session() -> None:
+    get_http_session()
 
 
-def get_cache(key: str) -> Optional[dict[str, Any]]:
-    entry = cache.get(key)
-    if not entry:
-        return None
-    if time.time() > entry["expires_at"]:
-        cache.pop(key, None)
-        return None
-    return entry["value"]
+@app.on_event("shutdown")
+async def close_http_session() -> None:
+    if http_session is not None:
+        await http_session.close()
 
 
-def set_map_cache(key: str, value: dict[str, Any]) -> None:
-    map_cache[key] = {"value": value, "expires_at": time.time() + MAP_CACHE_TTL_SECONDS}
+async def purge_caches() -> None:
+    while True:
+        await asyncio.sleep(CACHE_PURGE_INTERVAL_SECONDS)
+        for store in (cache, map_cache, grid_cache, nws_points_cache):
+            store.purge()
 
 
-def get_map_cache(key: str) -> Optional[dict[str, Any]]:
-    entry = map_cache.get(key)
-    if not entry:
-        return None
-    if time.time() > entry["expires_at"]:
-        map_cache.pop(key, None)
-        return None
-    return entry["value"]
+@app.on_event("startup")
+async def start_cache_janitor() -> None:
+    global janitor_task
+    janitor_task = asyncio.create_task(purge_caches())
 
 
-def set_grid_cache(key: str, value: dict[str, Any]) -> None:
-    grid_cache[key] = {"value": value, "expires_at": time.time() + GRID_CACHE_TTL_SECONDS}
+@app.on_event("shutdown")
+async def stop_cache_janitor() -> None:
+    if janitor_task is not None:
+        janitor_task.cancel()
 
 
-def get_grid_cache(key: str) -> Optional[dict[str, Any]]:
-    entry = grid_cache.get(key)
-    if not entry:
-        return None
-    if time.time() > entry["expires_at"]:
-        grid_cache.pop(key, None)
-        return None
-    return entry["value"]
+def load_spots() -> list[dict[str, Any]]:
+    if not SPOTS_PATH.exists():
+        return []
+    try:
+        with SPOTS_PATH.open("rb") as handle, mmap.mmap(
+            handle.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mapped, memoryview(mapped) as view:
+            return orjson.loads(view)
+    except ValueError:
+        # Raised for empty files (mmap) as well as malformed JSON.
+        return []
+
+
+spots = load_spots()
+spots_by_id: dict[str, dict[str, Any]] = {spot["id"]: spot for spot in spots if "id" in spot}
+
+
+def get_refresh_task(
+    key: str, build: Callable[[], Awaitable[bytes]]
+) -> asyncio.Task:
+    # Collapse concurrent rebuilds of the same cache key onto one task.
+    task = inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(build())
+        inflight[key] = task
+        task.add_done_callback(lambda done: finish_refresh_task(key, done))
+    return task
+
+
+def finish_refresh_task(key: str, task: asyncio.Task) -> None:
+    inflight.pop(key, None)
+    # Background refreshes are never awaited, so surface their failures here.
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Cache refresh for %s failed", key, exc_info=task.exception())
+
+
+def iso_now() -> str:
+    global timestamp_cache
+    now = int(time.time())
+    if now != timestamp_cache[0]:
+        timestamp_cache = (now, time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now)))
+    return timestamp_cache[1]
 
 
 def clamp_number(value: float, min_value: float, max_value: float) -> float:
@@ -93,7 +244,7 @@ def clamp_number(value: float, min_value: float, max_value: float) -> float:
 
 
 def get_spot_by_id(spot_id: str) -> Optional[dict[str, Any]]:
-    return next((spot for spot in spots if spot.get("id") == spot_id), None)
+    return spots_by_id.get(spot_id)
 
 
 def get_sailability(
@@ -133,31 +284,50 @@ def get_sailability(
 
 
 def slice_hourly(
-    hourly: Optional[dict[str, list[Any]]], count: int = 24
+    hourly: Optional[dict[str, list[Any]]], keys: frozenset[str], count: int = 24
 ) -> Optional[dict[str, list[Any]]]:
     if not hourly or not isinstance(hourly.get("time"), list):
         return None
-    limited: dict[str, list[Any]] = {}
-    for key, values in hourly.items():
-        if isinstance(values, list):
-            limited[key] = values[:count]
-    return limited
+    return {
+        key: values[:count]
+        for key, values in hourly.items()
+        if key in keys and isinstance(values, list)
+    }
 
 
-async def fetch_json(url: str, timeout_seconds: float = 8.0) -> dict[str, Any]:
-    async with httpx.AsyncClient(timeout=timeout_seconds) as client:
-        response = await client.get(url)
-        response.raise_for_status()
-        return response.json()
+def get_retry_delay(response: aiohttp.ClientResponse, attempt: int) -> float:
+    retry_after = response.headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        return float(retry_after)
+    # Exponential backoff with full jitter when the upstream gives no hint.
+    return random.uniform(0, FETCH_RETRY_BASE_SECONDS * 2 ** (attempt - 1))
 
 
-async def fetch_json_with_headers(
-    url: str, headers: dict[str, str], timeout_seconds: float = 8.0
-) -> dict[str, Any]:
-    async with httpx.AsyncClient(timeout=timeout_seconds, headers=headers) as client:
-        response = await client.get(url)
-        response.raise_for_status()
-        return response.json()
+async def fetch_json(url: str, timeout_seconds: float = 8.0) -> dict[str, Any]:
+    # One deadline covers every attempt, so retries never extend the caller's wait.
+    deadline = time.monotonic() + timeout_seconds
+    attempt = 1
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise asyncio.TimeoutError(f"Timed out fetching {url}")
+        timeout = aiohttp.ClientTimeout(total=remaining)
+        async with get_http_session().get(url, timeout=timeout) as response:
+            delay = None
+            if response.status in FETCH_RETRY_STATUSES and attempt < FETCH_MAX_ATTEMPTS:
+                delay = get_retry_delay(response, attempt)
+            if delay is None or delay >= deadline - time.monotonic():
+                response.raise_for_status()
+                return orjson.loads(await response.read())
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+async def capture_errors(awaitable: Awaitable[Any]) -> Any:
+    try:
+        return await awaitable
+    except Exception as exc:
+        return exc
 
 
 def mph_to_knots(speed_mph: float) -> float:
@@ -165,35 +335,14 @@ def mph_to_knots(speed_mph: float) -> float:
 
 
 def parse_wind_speed(speed_text: str) -> Optional[float]:
-    matches = re.findall(r"\d+", speed_text)
-    if not matches:
+    values = [int(match.group()) for match in WIND_SPEED_PATTERN.finditer(speed_text)]
+    if not values:
         return None
-    values = [float(val) for val in matches]
-    if len(values) == 1:
-        return mph_to_knots(values[0])
     return mph_to_knots(sum(values) / len(values))
 
 
-def cardinal_to_degrees(cardinal: str) -> Optional[int]:
-    mapping = {
-        "N": 0,
-        "NNE": 22,
-        "NE": 45,
-        "ENE": 67,
-        "E": 90,
-        "ESE": 112,
-        "SE": 135,
-        "SSE": 157,
-        "S": 180,
-        "SSW": 202,
-        "SW": 225,
-        "WSW": 247,
-        "W": 270,
-        "WNW": 292,
-        "NW": 315,
-        "NNW": 337,
-    }
-    return mapping.get(cardinal.upper())
+def cardinal_to_degrees(cardinal: str) -> Optional[float]:
+    return CARDINAL_DEGREES.get(cardinal.upper())
 
 
 def aggregate_wind(samples: list[dict[str, Any]]) -> Optional[dict[str, Any]]:
@@ -201,17 +350,17 @@ def aggregate_wind(samples: list[dict[str, Any]]) -> Optional[dict[str, Any]]:
     if not valid:
         return None
 
-    speeds = [sample["speed_knots"] for sample in valid]
-    mean_speed = sum(speeds) / len(speeds)
-    variance = sum((speed - mean_speed) ** 2 for speed in speeds) / len(speeds)
-    std_dev = math.sqrt(variance) if len(speeds) > 1 else 0.0
-
-    directions = [sample.get("direction_deg") for sample in valid if sample.get("direction_deg") is not None]
-    if directions:
-        angles = [math.radians(deg) for deg in directions]
-        sin_sum = sum(math.sin(angle) for angle in angles)
-        cos_sum = sum(math.cos(angle) for angle in angles)
-        avg_angle = math.degrees(math.atan2(sin_sum / len(angles), cos_sum / len(angles)))
+    speeds = np.fromiter((sample["speed_knots"] for sample in valid), dtype=np.float64, count=len(valid))
+    mean_speed = float(speeds.mean())
+    std_dev = float(speeds.std()) if speeds.size > 1 else 0.0
+
+    directions = np.fromiter(
+        (sample["direction_deg"] for sample in valid if sample.get("direction_deg") is not None),
+        dtype=np.float64,
+    )
+    if directions.size:
+        angles = np.radians(directions)
+        avg_angle = math.degrees(math.atan2(np.sin(angles).mean(), np.cos(angles).mean()))
         mean_direction = int((avg_angle + 360) % 360)
     else:
         mean_direction = None
@@ -225,17 +374,7 @@ def aggregate_wind(samples: list[dict[str, Any]]) -> Optional[dict[str, Any]]:
 
 
 async def fetch_open_meteo_wind(latitude: float, longitude: float) -> dict[str, Any]:
-    forecast_url = (
-        "https://api.open-meteo.com/v1/forecast"
-        f"?latitude={latitude}"
-        f"&longitude={longitude}"
-        "&hourly=temperature_2m,windspeed_10m,winddirection_10m,windgusts_10m,weathercode"
-        "&current_weather=true"
-        "&past_days=1"
-        "&windspeed_unit=kn"
-        "&temperature_unit=fahrenheit"
-        "&timezone=auto"
-    )
+    forecast_url = OPEN_METEO_FORECAST_URL.format(lat=latitude, lon=longitude)
     forecast = await fetch_json(forecast_url)
     return {"data": forecast, "url": forecast_url}
 
@@ -243,24 +382,20 @@ async def fetch_open_meteo_wind(latitude: float, longitude: float) -> dict[str,
 async def fetch_open_meteo_grid(latitudes: list[float], longitudes: list[float]) -> dict[str, Any]:
     lat_param = ",".join(f"{lat:.4f}" for lat in latitudes)
     lon_param = ",".join(f"{lon:.4f}" for lon in longitudes)
-    grid_url = (
-        "https://api.open-meteo.com/v1/forecast"
-        f"?latitude={lat_param}"
-        f"&longitude={lon_param}"
-        "&current_weather=true"
-        "&windspeed_unit=kn"
-        "&timezone=auto"
-    )
+    grid_url = OPEN_METEO_GRID_URL.format(lat=lat_param, lon=lon_param)
     data = await fetch_json(grid_url)
     return {"data": data, "url": grid_url}
 
 
 async def fetch_nws_wind(latitude: float, longitude: float) -> dict[str, Any]:
-    headers = {"User-Agent": "knot (contact: weisfoo.com)"}
-    points_url = f"https://api.weather.gov/points/{latitude},{longitude}"
-    points = await fetch_json_with_headers(points_url, headers=headers)
-    hourly_url = points["properties"]["forecastHourly"]
-    hourly = await fetch_json_with_headers(hourly_url, headers=headers)
+    point = (round(latitude, 3), round(longitude, 3))
+    hourly_url = nws_points_cache.get(point)
+    if hourly_url is None:
+        points_url = NWS_POINTS_URL.format(lat=point[0], lon=point[1])
+        points = await fetch_json(points_url)
+        hourly_url = points["properties"]["forecastHourly"]
+        nws_points_cache.set(point, hourly_url)
+    hourly = await fetch_json(hourly_url)
     periods = hourly.get("properties", {}).get("periods", [])
     if not periods:
         raise ValueError("No hourly periods available.")
@@ -290,7 +425,7 @@ async def api_conditions(
     spot: Optional[str] = None,
     lat: Optional[float] = Query(default=None),
     lon: Optional[float] = Query(default=None),
-) -> JSONResponse:
+) -> Response:
     spot_data = None
     latitude = lat
     longitude = lon
@@ -305,16 +440,32 @@ async def api_conditions(
     if latitude is None or longitude is None:
         raise HTTPException(status_code=400, detail="Provide lat/lon or a valid spot id.")
 
-    latitude = clamp_number(latitude, -90, 90)
-    longitude = clamp_number(longitude, -180, 180)
+    # Quantize once so the cache key, the response location and every upstream
+    # request agree; nearby requests then share one cached body.
+    latitude = round(clamp_number(latitude, -90, 90), COORDINATE_DECIMALS)
+    longitude = round(clamp_number(longitude, -180, 180), COORDINATE_DECIMALS)
 
     cache_key = f"conditions:{spot_data['id'] if spot_data else 'latlon'}:{latitude}:{longitude}"
-    cached = get_cache(cache_key)
-    if cached:
-        return JSONResponse(cached)
 
+    def build() -> Awaitable[bytes]:
+        return build_conditions(cache_key, spot_data, latitude, longitude)
+
+    entry = cache.get_stale(cache_key)
+    if entry is not None:
+        body, is_fresh = entry
+        if not is_fresh:
+            get_refresh_task(cache_key, build)
+        return Response(content=body, media_type="application/json")
+
+    body = await asyncio.shield(get_refresh_task(cache_key, build))
+    return Response(content=body, media_type="application/json")
+
+
+async def build_conditions(
+    cache_key: str, spot_data: Optional[dict[str, Any]], latitude: float, longitude: float
+) -> bytes:
     response: dict[str, Any] = {
-        "updated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "updated_at": iso_now(),
         "location": {
             "name": spot_data["name"] if spot_data else None,
             "lat": latitude,
@@ -329,8 +480,22 @@ async def api_conditions(
         "thresholds": {"wind_knots": WIND_THRESHOLD_KT, "tide_ft": TIDE_THRESHOLD_FT},
     }
 
-    try:
-        forecast_payload = await fetch_open_meteo_wind(latitude, longitude)
+    marine_url = OPEN_METEO_MARINE_URL.format(lat=latitude, lon=longitude)
+
+    tide_url = None
+    if spot_data and spot_data.get("noaa_tide_station"):
+        tide_url = NOAA_TIDES_URL.format(station=spot_data["noaa_tide_station"])
+
+    async with asyncio.TaskGroup() as group:
+        forecast_task = group.create_task(capture_errors(fetch_open_meteo_wind(latitude, longitude)))
+        marine_task = group.create_task(capture_errors(fetch_json(marine_url)))
+        nws_task = group.create_task(capture_errors(fetch_nws_wind(latitude, longitude)))
+        tides_task = group.create_task(capture_errors(fetch_json(tide_url))) if tide_url else None
+
+    forecast_payload = forecast_task.result()
+    if isinstance(forecast_payload, Exception):
+        response["sources"]["open_meteo"] = {"ok": False, "error": str(forecast_payload)}
+    else:
         forecast = forecast_payload["data"]
         response["sources"]["open_meteo"] = {"ok": True, "url": forecast_payload["url"]}
         current_weather = forecast.get("current_weather")
@@ -348,45 +513,22 @@ async def api_conditions(
                 "weather_code": current_weather.get("weathercode"),
             }
 
-        response["hourly"] = slice_hourly(forecast.get("hourly"))
-    except Exception as exc:
-        response["sources"]["open_meteo"] = {"ok": False, "error": str(exc)}
-
-    marine_url = (
-        "https://marine-api.open-meteo.com/v1/marine"
-        f"?latitude={latitude}"
-        f"&longitude={longitude}"
-        "&hourly=wave_height,wave_direction,wave_period"
-        "&timezone=auto"
-    )
+        response["hourly"] = slice_hourly(forecast.get("hourly"), FORECAST_HOURLY_KEYS)
 
-    try:
-        marine = await fetch_json(marine_url)
+    marine = marine_task.result()
+    if isinstance(marine, Exception):
+        response["sources"]["open_meteo_marine"] = {"ok": False, "error": str(marine), "url": marine_url}
+    else:
         response["sources"]["open_meteo_marine"] = {"ok": True, "url": marine_url}
-        response["marine"] = slice_hourly(marine.get("hourly"))
-    except Exception as exc:
-        response["sources"]["open_meteo_marine"] = {"ok": False, "error": str(exc), "url": marine_url}
+        response["marine"] = slice_hourly(marine.get("hourly"), MARINE_HOURLY_KEYS)
 
-    if spot_data and spot_data.get("noaa_tide_station"):
-        station = spot_data["noaa_tide_station"]
-        tide_url = (
-            "https://api.tidesandcurrents.noaa.gov/api/prod/datagetter"
-            "?product=predictions"
-            "&application=knot"
-            "&date=today"
-            "&datum=MLLW"
-            f"&station={station}"
-            "&time_zone=lst_ldt"
-            "&interval=hilo"
-            "&units=english"
-            "&format=json"
-        )
-        try:
-            tides = await fetch_json(tide_url)
+    if tides_task is not None:
+        tides = tides_task.result()
+        if isinstance(tides, Exception):
+            response["sources"]["noaa_tides"] = {"ok": False, "error": str(tides), "url": tide_url}
+        else:
             response["sources"]["noaa_tides"] = {"ok": True, "url": tide_url}
             response["tides"] = tides.get("predictions")
-        except Exception as exc:
-            response["sources"]["noaa_tides"] = {"ok": False, "error": str(exc), "url": tide_url}
 
     response["sailability"] = get_sailability(response.get("current"), response.get("tides"))
     wind_samples = []
@@ -399,8 +541,10 @@ async def api_conditions(
             }
         )
 
-    try:
-        nws_payload = await fetch_nws_wind(latitude, longitude)
+    nws_payload = nws_task.result()
+    if isinstance(nws_payload, Exception):
+        response["sources"]["nws"] = {"ok": False, "error": str(nws_payload)}
+    else:
         response["sources"]["nws"] = {"ok": True, "url": nws_payload["url"]}
         nws_data = nws_payload["data"]
         wind_samples.append(
@@ -410,29 +554,60 @@ async def api_conditions(
                 "direction_deg": nws_data.get("wind_direction_deg"),
             }
         )
-    except Exception as exc:
-        response["sources"]["nws"] = {"ok": False, "error": str(exc)}
 
     response["wind_aggregate"] = aggregate_wind(wind_samples)
-    set_cache(cache_key, response)
-    return JSONResponse(response)
+    body = orjson.dumps(response)
+    cache.set(cache_key, body)
+    return body
 
 
 @app.get("/api/map")
-async def api_map() -> JSONResponse:
-    cached = get_map_cache("map")
-    if cached:
-        return JSONResponse(cached)
+async def api_map() -> Response:
+    entry = map_cache.get_stale("map")
+    if entry is not None:
+        body, is_fresh = entry
+        if not is_fresh:
+            get_refresh_task("map", build_map)
+        return Response(content=body, media_type="application/json")
+
+    body = await asyncio.shield(get_refresh_task("map", build_map))
+    return Response(content=body, media_type="application/json")
+
+
+async def build_map() -> bytes:
+    async def fetch_forecasts() -> list[Optional[dict[str, Any]]]:
+        forecasts: list[Optional[dict[str, Any]]] = []
+        if spots:
+            try:
+                forecast_payload = await fetch_open_meteo_grid(
+                    [spot["lat"] for spot in spots], [spot["lon"] for spot in spots]
+                )
+                data = forecast_payload["data"]
+                # Open-Meteo only wraps multi-location responses in a list.
+                forecasts = data if isinstance(data, list) else [data]
+            except Exception:
+                pass
+        forecasts.extend([None] * (len(spots) - len(forecasts)))
+        return forecasts
+
+    async def fetch_spot_nws(spot: dict[str, Any]) -> Optional[dict[str, Any]]:
+        async with map_semaphore:
+            try:
+                nws_payload = await fetch_nws_wind(spot["lat"], spot["lon"])
+            except Exception:
+                return None
+        return nws_payload["data"]
+
+    # The batched forecast and the NWS fan-out run side by side.
+    forecasts, nws_results = await asyncio.gather(
+        fetch_forecasts(), asyncio.gather(*(fetch_spot_nws(spot) for spot in spots))
+    )
 
-    async def build_spot(spot: dict[str, Any]) -> dict[str, Any]:
-        latitude = spot["lat"]
-        longitude = spot["lon"]
+    spots_payload: list[dict[str, Any]] = []
+    for spot, forecast, nws_data in zip(spots, forecasts, nws_results):
         wind_samples: list[dict[str, Any]] = []
-
-        try:
-            forecast_payload = await fetch_open_meteo_wind(latitude, longitude)
-            forecast = forecast_payload["data"]
-            current_weather = forecast.get("current_weather", {})
+        if forecast:
+            current_weather = forecast.get("current_weather") or {}
             wind_samples.append(
                 {
                     "source": "open_meteo",
@@ -440,12 +615,7 @@ async def api_map() -> JSONResponse:
                     "direction_deg": current_weather.get("winddirection"),
                 }
             )
-        except Exception:
-            pass
-
-        try:
-            nws_payload = await fetch_nws_wind(latitude, longitude)
-            nws_data = nws_payload["data"]
+        if nws_data:
             wind_samples.append(
                 {
                     "source": "nws",
@@ -453,22 +623,20 @@ async def api_map() -> JSONResponse:
                     "direction_deg": nws_data.get("wind_direction_deg"),
                 }
             )
-        except Exception:
-            pass
-
-        aggregate = aggregate_wind(wind_samples)
-        return {
-            "id": spot["id"],
-            "name": spot["name"],
-            "lat": latitude,
-            "lon": longitude,
-            "wind": aggregate,
-        }
+        spots_payload.append(
+            {
+                "id": spot["id"],
+                "name": spot["name"],
+                "lat": spot["lat"],
+                "lon": spot["lon"],
+                "wind": aggregate_wind(wind_samples),
+            }
+        )
 
-    spots_payload = await asyncio.gather(*(build_spot(spot) for spot in spots))
-    response = {"updated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "spots": spots_payload}
-    set_map_cache("map", response)
-    return JSONResponse(response)
+    response = {"updated_at": iso_now(), "spots": spots_payload}
+    body = orjson.dumps(response)
+    map_cache.set("map", body)
+    return body
 
 
 @app.get("/api/wind-grid")
@@ -486,7 +654,7 @@ async def api_wind_grid(
         raise HTTPException(status_code=400, detail="bbox must be numeric") from exc
 
     cache_key = f"{west:.2f}:{south:.2f}:{east:.2f}:{north:.2f}:{rows}:{cols}"
-    cached = get_grid_cache(cache_key)
+    cached = grid_cache.get(cache_key)
     if cached:
         return JSONResponse(cached)
 
@@ -519,7 +687,7 @@ async def api_wind_grid(
                 }
             )
         response = {
-            "updated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "updated_at": iso_now(),
             "rows": rows,
             "cols": cols,
             "points": points,
@@ -527,14 +695,14 @@ async def api_wind_grid(
         }
     except Exception as exc:
         response = {
-            "updated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "updated_at": iso_now(),
             "rows": rows,
             "cols": cols,
             "points": [],
             "source": {"ok": False, "error": str(exc)},
         }
 
-    set_grid_cache(cache_key, response)
+    grid_cache.set(cache_key, response)
     return JSONResponse(response)
 
 